@@ -1,11 +1,21 @@
 import streamlit as st
+import io
 import json
-import random
 import pandas as pd
 import matplotlib.pyplot as plt
 import os
+import time
 from pathlib import Path
 
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+import psychometrics
+from image_cache import ImageCache, candidate_paths, path_cache_stats
+from instrumentation import metrics
+from question_model import DIFFICULTIES, TOPICS, filter_questions, load_question_file, question_statistics
+from quiz_sampler import Blueprint, QuizSampler
+from render_model import render_cache_stats, render_model
+
 # Set page configuration
 st.set_page_config(
     page_title="Data Engineer Exam Questions",
@@ -72,32 +82,21 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Image bytes are cached in memory for all sessions (budget in MB via IMAGE_CACHE_MB)
+@st.cache_resource
+def get_image_cache():
+    budget_mb = float(os.environ.get("IMAGE_CACHE_MB", "64"))
+    return ImageCache(int(budget_mb * 1024 * 1024))
+
 # Function to display an image from the extracted_images folder
+@metrics.timed("display_image")
 def display_image(image_path):
     try:
-        # Check if image_path already contains 'extracted_images' and remove it if needed
-        clean_path = image_path
-        if 'extracted_images/' in clean_path:
-            clean_path = clean_path.replace('extracted_images/', '')
-        
-        # Try different path combinations
-        possible_paths = [
-            Path("extracted_images") / clean_path,  # Normal path
-            Path("extracted_images") / clean_path.replace('-', '_'),  # Replace hyphens with underscores
-            Path("extracted_images") / clean_path.replace('_', '-'),  # Replace underscores with hyphens
-            Path(clean_path),  # Direct path
-            Path("extracted_images") / f"{clean_path.split('.')[0]}.png"  # Try with png extension
-        ]
-        
-        # Try each path
-        image_found = False
-        for path in possible_paths:
-            if os.path.exists(path):
-                st.image(str(path))
-                image_found = True
-                break
-        
-        if not image_found:
+        image_bytes = get_image_cache().get(image_path)
+        if image_bytes is not None:
+            st.image(image_bytes)
+        else:
+            possible_paths = candidate_paths(image_path)
             st.warning(f"Image not found: {image_path}")
             # Debug info to help find the missing image
             st.write(f"Looked for: {', '.join(str(p) for p in possible_paths)}")
@@ -105,7 +104,7 @@ def display_image(image_path):
             # List available images in extracted_images folder with similar filenames
             image_dir = Path("extracted_images")
             if image_dir.exists() and image_dir.is_dir():
-                base_name = clean_path.split('.')[0]
+                base_name = possible_paths[-1].stem
                 similar_images = [f for f in os.listdir(image_dir) if base_name in f]
                 if similar_images:
                     st.write(f"Similar images found: {', '.join(similar_images)}")
@@ -113,13 +112,11 @@ def display_image(image_path):
     except Exception as e:
         st.error(f"Error displaying image: {str(e)}")
 
-# Load questions
-@st.cache_data
+# Load questions (built once and shared across sessions; treat them as read-only)
+@st.cache_resource
 def load_questions():
     try:
-        with open('clean_exam_questions.json', 'r') as f:
-            questions = json.load(f)
-        return questions
+        return load_question_file('clean_exam_questions.json')
     except FileNotFoundError:
         st.error("Could not find the questions file (clean_exam_questions.json). Make sure it exists in the current directory.")
         return []
@@ -130,12 +127,39 @@ def load_questions():
         st.error(f"An error occurred while loading questions: {str(e)}")
         return []
 
+# Per-topic/difficulty question pools for quiz sampling, built once per process
+@st.cache_resource
+def get_quiz_sampler():
+    return QuizSampler(load_questions())
+
+# How many recently seen questions to remember for "Skip recently seen questions"
+RECENT_QUESTION_LIMIT = 200
+# How many quiz seeds to remember the skipped questions of, so entering a shown seed repeats its quiz
+RECENT_SEED_LIMIT = 20
+
+# Learner analytics over uploaded attempt logs
+@st.cache_data
+def analyze_attempts(file_bytes, file_name, _questions):
+    source = io.BytesIO(file_bytes)
+    source.name = file_name
+    attempts = psychometrics.load_attempts(source)
+    matrix = psychometrics.build_answer_matrix(attempts, _questions)
+    question_topics = {q.number: q.topic for q in _questions}
+    return {
+        "responses": int(matrix.answered.sum()),
+        "learners": len(matrix.learners),
+        "items": psychometrics.item_statistics(matrix),
+        "distractors": psychometrics.distractor_rates(matrix),
+        "mastery": psychometrics.topic_mastery(matrix, question_topics),
+    }
+
+@metrics.timed("display_single_question")
 def display_single_question(question, in_quiz=False, default_answer=None, answer_key=None):
     """
     Display a single question with answer options
     
     Parameters:
-    - question: The question data to display
+    - question: The Question to display
     - in_quiz: Whether this is being displayed in a quiz (to handle radio/checkbox inputs)
     - default_answer: Default selected answer(s) (for quiz mode)
     - answer_key: Key for the input widgets (for quiz mode)
@@ -143,54 +167,24 @@ def display_single_question(question, in_quiz=False, default_answer=None, answer
     Returns:
     - The user's selected answer(s) if in quiz mode, otherwise None
     """
-    st.markdown(f"""
-    <div class="question-card">
-        <h3>Question {question.get('question_number', '')}</h3>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    # Question text
-    st.markdown(f"<p class='question-text'>{question['question_text']}</p>", unsafe_allow_html=True)
+    # Markup, option list and image groups are compiled once per question and cached
+    model = render_model(question)
     
-    # Get all associated images
-    all_images = question.get('images', [])
-    question_images = []
-    answer_images = {}
-    
-    if all_images:
-        # Sort images into question images and answer images
-        for img_path in all_images:
-            # Extract the base filename without path
-            filename = os.path.basename(img_path) if "/" in img_path else img_path
-            base_name = filename.split('.')[0]  # Remove extension
-            
-            # Check if the filename has a letter suffix (like "44_a")
-            if len(base_name) > 2 and base_name[-2] == '_' and base_name[-1].isalpha():
-                # This is an answer image
-                answer_letter = base_name[-1].upper()  # Extract the letter (a, b, c, etc.)
-                if answer_letter not in answer_images:
-                    answer_images[answer_letter] = []
-                answer_images[answer_letter].append(img_path)
-            else:
-                # This is a question image
-                question_images.append(img_path)
+    # Question card and text
+    st.markdown(model.intro_html, unsafe_allow_html=True)
     
     # Display question images first
-    if question_images:
+    if model.question_images:
         st.write("**Question Images:**")
-        for img in question_images:
+        for img in model.question_images:
             display_image(img)
 
     # For quiz mode, display the appropriate input widget based on whether multiple answers are allowed
     selected_answer = None
     if in_quiz:
-        options = list(question.get('answers', {}).keys())
-        
-        # Check if the correct answer has multiple letters (like "AB" or "BCD")
-        correct_answer = question.get('correct_answer', '')
-        is_multiple_choice = len(correct_answer) > 1
+        options = model.options
         
-        if is_multiple_choice:
+        if model.widget == "checkbox":
             # For multiple choice questions, use checkboxes
             st.write("**Select all that apply:**")
             
@@ -224,47 +218,78 @@ def display_single_question(question, in_quiz=False, default_answer=None, answer
                 key=answer_key
             )
     
-    # Display answer options
-    for option, answer_text in question.get('answers', {}).items():
-        # Remove 'Most Voted' tag from answer text for fairness
-        clean_answer_text = answer_text.replace(' Most Voted', '').replace('Most Voted', '').strip()
-        st.markdown(f"""
-        <div class='answer-option'>
-            <strong>{option}:</strong> {clean_answer_text}
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # Display any images for this answer option
-        if option in answer_images and answer_images[option]:
-            st.write(f"**Answer {option} Images:**")
-            for img in answer_images[option]:
+    # Display answer options, each block followed by the images of its last answer
+    for block in model.answer_blocks:
+        st.markdown(block.html, unsafe_allow_html=True)
+        if block.images:
+            st.write(block.images_label)
+            for img in block.images:
                 display_image(img)
     
     # Show correct answer if needed (but not in quiz mode)
     if not in_quiz:
-        show_answer = st.checkbox("Show correct answer", key=f"show_answer_{question.get('question_number', '')}")
+        show_answer = st.checkbox("Show correct answer", key=model.show_answer_key)
         if show_answer:
-            correct = question.get('correct_answer', '')
-            st.markdown(f"<div class='correct-answer'><strong>Correct Answer: {correct}</strong></div>", unsafe_allow_html=True)
-            
-            # Show community vote distribution if available
-            if 'Community vote distribution' in question:
-                st.markdown(f"<div class='community-vote'>Community vote: {question['Community vote distribution']}</div>", unsafe_allow_html=True)
+            # Correct answer plus community vote distribution if available
+            st.markdown(model.correct_html, unsafe_allow_html=True)
     
     return selected_answer
 
+# Metrics are exported for a local scraper to METRICS_DIR every METRICS_EXPORT_INTERVAL seconds
+METRICS_DIR = os.environ.get("METRICS_DIR", "metrics")
+METRICS_EXPORT_INTERVAL = float(os.environ.get("METRICS_EXPORT_INTERVAL", "15"))
+# metrics.jsonl is rotated to metrics.jsonl.1 once it grows past this size
+METRICS_JSONL_MAX_MB = float(os.environ.get("METRICS_JSONL_MAX_MB", "10"))
+
+def is_admin():
+    # The metrics panel is shown when the page is opened with ?admin=<ADMIN_TOKEN>
+    admin_token = os.environ.get("ADMIN_TOKEN")
+    return bool(admin_token) and st.query_params.get("admin") == admin_token
+
+def record_cache_metrics():
+    metrics.set_gauges("image_cache", get_image_cache().stats())
+    metrics.set_gauges("image_path_cache", path_cache_stats())
+    metrics.set_gauges("render_cache", render_cache_stats())
+
+def display_metrics_panel():
+    """Admin-only sidebar view of the collected timings"""
+    snapshot = metrics.snapshot()
+    with st.sidebar.expander("Performance metrics"):
+        st.write(f"Active sessions: {snapshot['active_sessions']}")
+        image_cache = get_image_cache().stats()
+        st.write(f"Image cache hit rate: {image_cache['hit_rate']:.1%} "
+                 f"({image_cache['bytes'] / 1024 / 1024:.1f} of {image_cache['budget_bytes'] / 1024 / 1024:.0f} MB)")
+        
+        if snapshot["sections"]:
+            timings = pd.DataFrame(snapshot["sections"])
+            timings["mean ms"] = timings["mean_seconds"] * 1000
+            timings["max ms"] = timings["max_seconds"] * 1000
+            timings["last ms"] = timings["last_seconds"] * 1000
+            st.dataframe(timings[["page", "section", "count", "mean ms", "max ms", "last ms"]].round(2),
+                         hide_index=True)
+
+def show_figure(fig, section):
+    """Render a matplotlib figure (timed as `section`) and release it"""
+    with metrics.timer(section):
+        st.pyplot(fig)
+    plt.close(fig)
+
 def main():
     # Sidebar
     st.sidebar.title("Data Engineer Exam Prep")
     
     # Load questions
+    load_start = time.perf_counter()
     questions = load_questions()
+    load_seconds = time.perf_counter() - load_start
     question_count = len(questions)
     st.sidebar.info(f"Total Questions: {question_count}")
     st.sidebar.info("Case study questions are not included in this exam prep.")
     
     # Navigation
     page = st.sidebar.radio("Navigation", ["Browse Questions", "Practice Quiz", "Statistics", "About"])
+    metrics.set_page(page)
+    metrics.record("load_questions", load_seconds)
     
     if page == "Browse Questions":
         st.title("Browse Questions")
@@ -277,23 +302,18 @@ def main():
         
         with col2:
             # Get available topics (could be extracted from questions in a real app)
-            topics = ["All", "Machine Learning", "BigQuery", "Database", "Cloud Storage", "Data Processing"]
+            topics = ["All"] + TOPICS
             selected_topic = st.selectbox("Filter by topic", topics)
         
         # Filter questions based on search term and topic
-        filtered_questions = questions
-        if search_term:
-            filtered_questions = [q for q in filtered_questions if search_term.lower() in q["question_text"].lower()]
-        
-        if selected_topic != "All":
-            # Simplified topic filtering (in real app, would need to extract topics from questions)
-            filtered_questions = [q for q in filtered_questions if selected_topic.lower() in q["question_text"].lower()]
+        with metrics.timer("filter_questions"):
+            filtered_questions = filter_questions(questions, search_term, selected_topic)
         
         st.info(f"Showing {len(filtered_questions)} of {question_count} questions")
         
         # Display questions
         for i, question in enumerate(filtered_questions):
-            with st.expander(f"Question {question['question_number']}: {question['question_text'][:100]}...", expanded=False):
+            with st.expander(render_model(question).expander_label, expanded=False):
                 display_single_question(question)
 
     elif page == "Practice Quiz":
@@ -302,9 +322,31 @@ def main():
         # Quiz settings
         num_questions = st.sidebar.slider("Number of questions", 10, 50, 20)
         quiz_topics = st.sidebar.multiselect("Choose topics (optional)", 
-                                             ["Machine Learning", "BigQuery", "Database", "Cloud Storage", "Data Processing"],
+                                             TOPICS,
                                              [])
         
+        # Quiz blueprint: section weights, difficulty mix, multi-answer share and seed
+        sampler = get_quiz_sampler()
+        with st.sidebar.expander("Quiz blueprint"):
+            st.write("Section weights (%)")
+            blueprint_topics = quiz_topics or TOPICS + ["Other"]
+            topic_weights = {}
+            for topic in blueprint_topics:
+                default_weight = 100 // len(quiz_topics) if quiz_topics else round(sampler.topic_shares.get(topic, 0) * 100)
+                topic_weights[topic] = st.slider(topic, 0, 100, default_weight, key=f"weight_{topic}")
+            
+            st.write("Difficulty mix (%)")
+            difficulty_weights = {}
+            for difficulty in DIFFICULTIES:
+                default_weight = round(sampler.difficulty_shares.get(difficulty, 0) * 100)
+                difficulty_weights[difficulty] = st.slider(difficulty, 0, 100, default_weight, key=f"difficulty_{difficulty}")
+            
+            multi_answer_percent = st.slider("Multi-answer questions (%)", 0, 100,
+                                             round(sampler.multi_answer_share * 100))
+            skip_recent = st.checkbox("Skip recently seen questions", value=True,
+                                      help="Ignored when a seed is entered: the seed repeats the quiz it was shown with")
+            seed = st.number_input("Seed (0 = random)", min_value=0, value=0, step=1)
+        
         # Initialize session state if not already done
         if "quiz_started" not in st.session_state:
             st.session_state.quiz_started = False
@@ -316,21 +358,64 @@ def main():
             st.session_state.quiz_questions = []
         if "answers" not in st.session_state:
             st.session_state.answers = {}
+        if "recent_questions" not in st.session_state:
+            st.session_state.recent_questions = []
+        if "seed_exclusions" not in st.session_state:
+            st.session_state.seed_exclusions = {}
         
         # Start quiz button
         if st.sidebar.button("Start New Quiz"):
-            # Randomly select questions
             if question_count > 0:
-                # In a real app, would filter by topics if selected
-                quiz_questions = random.sample(questions, min(num_questions, question_count))
-                st.session_state.quiz_questions = quiz_questions
-                st.session_state.current_question = 0
-                st.session_state.answers = {}
-                st.session_state.quiz_started = True
-                st.session_state.quiz_completed = False
+                # A seed shown earlier in this session replays its quiz with the questions it skipped;
+                # any other explicit seed draws from the whole bank so it repeats across sessions
+                if seed:
+                    exclude = st.session_state.seed_exclusions.get(int(seed), frozenset())
+                elif skip_recent:
+                    exclude = frozenset(st.session_state.recent_questions)
+                else:
+                    exclude = frozenset()
+                
+                # Draw questions to match the blueprint
+                blueprint = Blueprint(
+                    topic_weights=topic_weights,
+                    difficulty_weights=difficulty_weights,
+                    multi_answer_ratio=multi_answer_percent / 100,
+                    exclude=exclude,
+                    seed=int(seed) or None
+                )
+                quiz_questions, quiz_seed = sampler.sample(num_questions, blueprint)
+                
+                if not quiz_questions:
+                    st.error("No questions match this blueprint. Adjust the weights or allow recently seen questions.")
+                else:
+                    if len(quiz_questions) < num_questions:
+                        st.sidebar.warning(f"Only {len(quiz_questions)} questions match this blueprint.")
+                    
+                    # Remember what was drawn so later quizzes can skip it
+                    recent = st.session_state.recent_questions + quiz_questions
+                    st.session_state.recent_questions = recent[-RECENT_QUESTION_LIMIT:]
+                    st.session_state.quiz_seed = quiz_seed
+                    seed_exclusions = st.session_state.seed_exclusions
+                    seed_exclusions.pop(quiz_seed, None)
+                    seed_exclusions[quiz_seed] = exclude
+                    while len(seed_exclusions) > RECENT_SEED_LIMIT:
+                        del seed_exclusions[next(iter(seed_exclusions))]
+                    st.session_state.quiz_questions = quiz_questions
+                    st.session_state.current_question = 0
+                    st.session_state.answers = {}
+                    st.session_state.quiz_started = True
+                    st.session_state.quiz_completed = False
             else:
                 st.error("No questions available.")
         
+        if st.session_state.quiz_started and "quiz_seed" in st.session_state:
+            skipped = len(st.session_state.seed_exclusions.get(st.session_state.quiz_seed, ()))
+            if skipped:
+                st.sidebar.caption(f"Quiz seed: {st.session_state.quiz_seed} "
+                                   f"(skipped {skipped} recently seen questions; the seed repeats this quiz in this session)")
+            else:
+                st.sidebar.caption(f"Quiz seed: {st.session_state.quiz_seed}")
+        
         # Check if quiz has started
         if not st.session_state.quiz_started:
             st.info("Configure your quiz settings in the sidebar and click 'Start New Quiz'.")
@@ -351,6 +436,10 @@ def main():
             if current_idx < len(quiz_questions) and not st.session_state.quiz_completed:
                 current_q = quiz_questions[current_idx]
                 
+                # Warm the image cache for the neighbouring questions so Next/Previous don't wait on disk
+                neighbours = [quiz_questions[i] for i in (current_idx + 1, current_idx - 1) if 0 <= i < len(quiz_questions)]
+                get_image_cache().prefetch(img for q in neighbours for img in q.images)
+                
                 # Progress bar
                 progress = (current_idx) / len(quiz_questions)
                 st.progress(progress)
@@ -404,30 +493,25 @@ def main():
                 answers = st.session_state.answers
                 
                 results_data = []
+                graded = []
                 
-                for idx, question in enumerate(quiz_questions):
-                    user_answer = answers.get(idx, "")
-                    correct_answer = question["correct_answer"]
-                    
-                    # Sort the letters in user_answer to ensure consistent comparison for multi-answer questions
-                    if user_answer and len(user_answer) > 1:
-                        user_answer = ''.join(sorted(user_answer))
-                    
-                    # Sort the letters in correct_answer to ensure consistent comparison
-                    if correct_answer and len(correct_answer) > 1:
-                        correct_answer = ''.join(sorted(correct_answer))
-                    
-                    is_correct = user_answer == correct_answer
-                    
-                    if is_correct:
-                        correct_count += 1
-                    
-                    results_data.append({
-                        "Question": f"Q{idx+1}",
-                        "Your Answer": user_answer,
-                        "Correct Answer": question["correct_answer"],  # Keep original order for display
-                        "Result": "Correct" if is_correct else "Incorrect"
-                    })
+                with metrics.timer("grading"):
+                    for idx, question in enumerate(quiz_questions):
+                        user_answer = answers.get(idx, "")
+                        
+                        # Compares pre-encoded answer bitmasks, so letter order doesn't matter
+                        is_correct = question.is_correct(user_answer)
+                        graded.append(is_correct)
+                        
+                        if is_correct:
+                            correct_count += 1
+                        
+                        results_data.append({
+                            "Question": f"Q{idx+1}",
+                            "Your Answer": user_answer,
+                            "Correct Answer": question.correct_answer,
+                            "Result": "Correct" if is_correct else "Incorrect"
+                        })
                 
                 score_percentage = (correct_count / len(quiz_questions)) * 100 if len(quiz_questions) > 0 else 0
                 
@@ -443,7 +527,7 @@ def main():
                 ax.text(passing_threshold + 1, 0, f'Passing ({passing_threshold}%)', va='center')
                 ax.set_yticks([])
                 ax.set_xlim(0, 100)
-                st.pyplot(fig)
+                show_figure(fig, "score_chart")
                 
                 # Results table
                 st.write("### Question Details")
@@ -460,26 +544,18 @@ def main():
                 st.write("### Review Questions")
                 for idx, question in enumerate(quiz_questions):
                     user_answer = answers.get(idx, "")
-                    correct_answer = question["correct_answer"]
-                    
-                    # Sort answers for comparison (not for display)
-                    user_answer_sorted = ''.join(sorted(user_answer)) if user_answer and len(user_answer) > 1 else user_answer
-                    correct_answer_sorted = ''.join(sorted(correct_answer)) if correct_answer and len(correct_answer) > 1 else correct_answer
-                    
-                    is_correct = user_answer_sorted == correct_answer_sorted
+                    is_correct = graded[idx]
                     
                     with st.expander(f"Question {idx+1}: {'✓' if is_correct else '✗'}"):
                         st.markdown("<div class='question-card'>", unsafe_allow_html=True)
                         
-                        # Create a custom display for the review that highlights correct/incorrect answers
-                        review_q = question.copy()
-                        display_single_question(review_q)
+                        display_single_question(question)
                         
                         # Add explicit feedback about the user's answer
                         if is_correct:
                             st.success(f"You answered correctly with '{user_answer}'")
                         else:
-                            st.error(f"You answered '{user_answer}', but the correct answer was '{correct_answer}'")
+                            st.error(f"You answered '{user_answer}', but the correct answer was '{question.correct_answer}'")
                             
                         st.markdown("</div>", unsafe_allow_html=True)
                 
@@ -494,31 +570,10 @@ def main():
         st.title("Question Statistics")
         
         if question_count > 0:
-            # Calculate topic distribution
-            topics = {
-                "Machine Learning": 0,
-                "BigQuery": 0,
-                "Database": 0,
-                "Cloud Storage": 0,
-                "Data Processing": 0,
-                "Other": 0
-            }
-            
-            # Simplified topic extraction - in real implementation would be more sophisticated
-            for q in questions:
-                text = q["question_text"].lower()
-                if "machine learning" in text or "model" in text or "train" in text:
-                    topics["Machine Learning"] += 1
-                elif "bigquery" in text:
-                    topics["BigQuery"] += 1
-                elif "database" in text or "sql" in text or "table" in text:
-                    topics["Database"] += 1
-                elif "storage" in text or "bucket" in text:
-                    topics["Cloud Storage"] += 1
-                elif "dataflow" in text or "dataproc" in text or "processing" in text:
-                    topics["Data Processing"] += 1
-                else:
-                    topics["Other"] += 1
+            # Calculate topic, consensus, answer and image distributions in one pass
+            with metrics.timer("question_statistics"):
+                stats = question_statistics(questions)
+            topics = stats["topics"]
             
             # Display topic distribution
             st.write("### Question Topics")
@@ -541,38 +596,12 @@ def main():
                             textcoords="offset points",
                             ha='center', va='bottom')
             
-            st.pyplot(fig)
+            show_figure(fig, "topic_chart")
             
             # Community vote consensus analysis
             st.write("### Community Consensus Analysis")
             
-            consensus_data = {
-                "Strong Consensus (90-100%)": 0,
-                "Moderate Consensus (70-89%)": 0,
-                "Split Opinion (50-69%)": 0,
-                "Highly Debated (<50%)": 0
-            }
-            
-            # Simple parsing of community vote data
-            for q in questions:
-                vote_str = q.get("Community vote distribution", "")
-                
-                # Extract the first percentage if it exists
-                import re
-                match = re.search(r"(\d+)%", vote_str)
-                if match:
-                    percentage = int(match.group(1))
-                    if percentage >= 90:
-                        consensus_data["Strong Consensus (90-100%)"] += 1
-                    elif percentage >= 70:
-                        consensus_data["Moderate Consensus (70-89%)"] += 1
-                    elif percentage >= 50:
-                        consensus_data["Split Opinion (50-69%)"] += 1
-                    else:
-                        consensus_data["Highly Debated (<50%)"] += 1
-                else:
-                    # If no percentage, count as unknown
-                    pass
+            consensus_data = stats["consensus"]
                     
             # Display consensus data
             consensus_chart = pd.DataFrame({
@@ -594,19 +623,12 @@ def main():
                             textcoords="offset points",
                             ha='center', va='bottom')
             
-            st.pyplot(fig2)
+            show_figure(fig2, "consensus_chart")
             
             # Answer distribution
             st.write("### Answer Distribution")
             
-            answer_counts = {"A": 0, "B": 0, "C": 0, "D": 0, "Multiple": 0}
-            
-            for q in questions:
-                correct = q.get("correct_answer", "")
-                if len(correct) == 1 and correct in answer_counts:
-                    answer_counts[correct] += 1
-                else:
-                    answer_counts["Multiple"] += 1
+            answer_counts = stats["answers"]
             
             # Display answer distribution
             answer_data = pd.DataFrame({
@@ -620,13 +642,13 @@ def main():
             ax3.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle
             ax3.set_title('Distribution of Correct Answers')
             
-            st.pyplot(fig3)
+            show_figure(fig3, "answer_chart")
             
             # Image statistics
             st.write("### Questions with Images")
             
             # Count questions with images
-            questions_with_images = sum(1 for q in questions if q.get("images") and len(q["images"]) > 0)
+            questions_with_images = stats["with_images"]
             questions_without_images = question_count - questions_with_images
             
             # Create pie chart for image stats
@@ -640,10 +662,47 @@ def main():
             )
             ax4.axis('equal')
             ax4.set_title('Questions with Images')
-            st.pyplot(fig4)
+            show_figure(fig4, "image_chart")
             
             st.write(f"**{questions_with_images}** questions ({questions_with_images/question_count:.1%}) have images")
             
+            # Learner analytics from imported attempt logs
+            st.write("### Learner Analytics")
+            st.write("Upload quiz attempt records with the columns `learner_id`, `question_number` and `selected_answer`.")
+            attempt_file = st.file_uploader("Attempt log", type=["csv", "jsonl", "parquet"])
+            
+            if attempt_file is not None:
+                try:
+                    analytics = analyze_attempts(attempt_file.getvalue(), attempt_file.name, questions)
+                except (ValueError, ImportError) as e:
+                    st.error(f"Could not analyze the attempt log: {str(e)}")
+                    analytics = None
+                
+                if analytics:
+                    items = analytics["items"]
+                    answered_items = items[items["responses"] > 0]
+                    st.write(f"**{analytics['responses']}** responses from **{analytics['learners']}** learners "
+                             f"covering **{len(answered_items)}** questions")
+                    
+                    # Difficulty vs discrimination scatter
+                    fig5, ax5 = plt.subplots(figsize=(10, 5))
+                    ax5.scatter(answered_items['difficulty'], answered_items['discrimination'], color='#0f4c81', alpha=0.6)
+                    ax5.axhline(y=0.2, color='red', linestyle='--')
+                    ax5.text(0.01, 0.21, 'Weak discrimination (<0.2)', color='red')
+                    ax5.set_xlabel('Difficulty (proportion correct)')
+                    ax5.set_ylabel('Discrimination (point-biserial)')
+                    ax5.set_xlim(0, 1)
+                    ax5.set_title('Question Difficulty vs Discrimination')
+                    show_figure(fig5, "item_analysis_chart")
+                    
+                    st.write("#### Question Statistics")
+                    st.dataframe(answered_items.join(analytics["distractors"]).sort_values("discrimination"))
+                    
+                    st.write("#### Topic Mastery")
+                    mastery = analytics["mastery"]
+                    st.dataframe(mastery.mean().rename("Average mastery").to_frame())
+                    st.dataframe(mastery)
+            
         else:
             st.error("No questions available for analysis.")
 
@@ -684,5 +743,18 @@ def main():
     </footer>
     """, unsafe_allow_html=True)
 
+def run():
+    # Time the whole rerun; st.rerun() raises, so the bookkeeping runs in finally
+    ctx = get_script_run_ctx()
+    metrics.begin_rerun(ctx.session_id if ctx else "")
+    try:
+        main()
+        if is_admin():
+            display_metrics_panel()
+    finally:
+        metrics.end_rerun()
+        record_cache_metrics()
+        metrics.maybe_export(METRICS_DIR, METRICS_EXPORT_INTERVAL, int(METRICS_JSONL_MAX_MB * 1024 * 1024))
+
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    run() 
\ No newline at end of file
@@ -0,0 +1,235 @@
+"""
+Scaling benchmarks for the question bank hot paths
+
+Times loading, render model compilation, Browse search and topic filtering,
+quiz sampling, Statistics aggregation and grading against synthetic banks of
+increasing size, and reports load memory and the scaling exponent between sizes:
+
+    python benchmark.py --sizes 1000 10000 100000 --output bench_results.json
+    python benchmark.py --baseline bench_results.json   # exit code 1 on regression
+
+Banks are generated with generate_bank.py on first use and reused afterwards.
+"""
+import argparse
+import gc
+import json
+import math
+import random
+import sys
+import time
+import tracemalloc
+
+from generate_bank import DEFAULT_SIZES, bank_path, generate_bank, write_bank
+from question_model import TOPICS, filter_questions, load_question_file, question_statistics
+from quiz_sampler import Blueprint, QuizSampler
+from render_model import RenderModel, render_model
+
+SEARCH_TERMS = ["bigquery", "pipeline", "no-such-term"]
+QUIZ_SIZE = 50
+
+
+def best_time(func, repeat):
+    """Best wall-clock time of `repeat` calls, in seconds"""
+    return best_time_and_result(func, repeat)[0]
+
+
+def best_time_and_result(func, repeat):
+    """Best wall-clock time of `repeat` calls and the last call's return value"""
+    best = math.inf
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def measure_load_memory(path):
+    """
+    Peak and retained traced memory (bytes) while loading a bank and rendering
+    every question once, i.e. what the app keeps after a full Browse
+    """
+    render_model.cache_clear()
+    gc.collect()
+    tracemalloc.start()
+    questions = load_question_file(path)
+    for question in questions:
+        render_model(question)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    render_model.cache_clear()
+    del questions
+    return {"retained_bytes": current, "peak_bytes": peak}
+
+
+def benchmark_bank(path, repeat=5, build_repeat=3, seed=0, memory=True):
+    """
+    Time each operation against one bank
+
+    Load-time builds (load, render_compile, sampler_build) are slow on large banks,
+    so they use build_repeat runs instead of repeat.
+
+    Returns:
+    - Dict of operation name -> best time in seconds, plus "memory" if requested
+    """
+    rng = random.Random(seed)
+    results = {}
+    results["load"], questions = best_time_and_result(lambda: load_question_file(path), build_repeat)
+    results["render_compile"] = best_time(lambda: [RenderModel(q) for q in questions], build_repeat)
+
+    results["browse_search"] = best_time(
+        lambda: [filter_questions(questions, term) for term in SEARCH_TERMS], repeat)
+    results["browse_topic_filter"] = best_time(
+        lambda: [filter_questions(questions, "", topic) for topic in TOPICS], repeat)
+
+    results["sampler_build"], sampler = best_time_and_result(lambda: QuizSampler(questions), build_repeat)
+    # A topic-restricted blueprint that skips the previous quiz, as the app draws it
+    blueprint = Blueprint(topic_weights={"BigQuery": 2, "Database": 1, "Other": 1}, multi_answer_ratio=0.1,
+                          exclude=set(sampler.sample(QUIZ_SIZE, Blueprint(seed=seed))[0]))
+    results["quiz_sampling"] = best_time(lambda: sampler.sample(QUIZ_SIZE, blueprint), repeat)
+    results["statistics"] = best_time(lambda: question_statistics(questions), repeat)
+
+    quiz = rng.sample(questions, min(QUIZ_SIZE, len(questions)))
+    answers = [rng.choice(q.options) if q.options else "" for q in quiz]
+    results["grading"] = best_time(
+        lambda: sum(q.is_correct(a) for q, a in zip(quiz, answers)), repeat)
+
+    del questions, quiz, sampler
+    if memory:
+        results["memory"] = measure_load_memory(path)
+    return results
+
+
+def ensure_bank(size, bank_dir, seed=0):
+    path = bank_path(bank_dir, size) / "clean_exam_questions.json"
+    if not path.exists():
+        print(f"Generating {size} question bank...", file=sys.stderr)
+        write_bank(generate_bank(size, seed=seed), path.parent)
+    return path
+
+
+def scaling_exponents(sizes, timings):
+    """Slope of log(time) vs log(size) between consecutive sizes (1.0 = linear)"""
+    exponents = []
+    for (n1, t1), (n2, t2) in zip(zip(sizes, timings), zip(sizes[1:], timings[1:])):
+        if t1 > 0 and t2 > 0:
+            exponents.append(math.log(t2 / t1) / math.log(n2 / n1))
+        else:
+            exponents.append(None)
+    return exponents
+
+
+def format_report(report):
+    sizes = report["sizes"]
+    operations = [op for op in report["results"][str(sizes[0])] if op != "memory"]
+    lines = ["Operation".ljust(22) + "".join(f"{size:>12,}" for size in sizes) + "   scaling"]
+    for op in operations:
+        timings = [report["results"][str(size)][op] for size in sizes]
+        exponents = scaling_exponents(sizes, timings)
+        scaling = " ".join("-" if e is None else f"{e:.2f}" for e in exponents)
+        lines.append(op.ljust(22) + "".join(f"{t * 1000:>10.2f}ms" for t in timings) + f"   {scaling}")
+
+    if "memory" in report["results"][str(sizes[0])]:
+        memory = [report["results"][str(size)]["memory"] for size in sizes]
+        lines.append("load peak memory".ljust(22) + "".join(f"{m['peak_bytes'] / 1e6:>10.1f}MB" for m in memory))
+        lines.append("load retained memory".ljust(22) + "".join(f"{m['retained_bytes'] / 1e6:>10.1f}MB" for m in memory))
+    return "\n".join(lines)
+
+
+def find_regressions(report, baseline, tolerance, min_delta=0.001, memory_tolerance=0.1):
+    """
+    List (size, metric, value, baseline value) for every regression against baseline
+
+    - Times regress when they exceed baseline by more than tolerance; slowdowns below
+      min_delta seconds are treated as timer noise
+    - Load peak memory ("peak_bytes") regresses when it exceeds baseline by more
+      than memory_tolerance
+    """
+    regressions = []
+    for size, ops in report["results"].items():
+        base_ops = baseline.get("results", {}).get(size, {})
+        for op, value in ops.items():
+            if op == "memory" or op not in base_ops:
+                continue
+            if value > base_ops[op] * (1 + tolerance) and value - base_ops[op] > min_delta:
+                regressions.append((size, op, value, base_ops[op]))
+
+        peak = ops.get("memory", {}).get("peak_bytes")
+        base_peak = base_ops.get("memory", {}).get("peak_bytes")
+        if peak is not None and base_peak is not None and peak > base_peak * (1 + memory_tolerance):
+            regressions.append((size, "peak_bytes", peak, base_peak))
+    return regressions
+
+
+def format_value(metric, value):
+    if metric == "peak_bytes":
+        return f"{value / 1e6:.1f}MB"
+    return f"{value * 1000:.2f}ms"
+
+
+def plot_report(report, path):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    sizes = report["sizes"]
+    fig, ax = plt.subplots(figsize=(10, 6))
+    for op in report["results"][str(sizes[0])]:
+        if op == "memory":
+            continue
+        ax.plot(sizes, [report["results"][str(size)][op] for size in sizes], marker='o', label=op)
+    ax.set_xscale('log')
+    ax.set_yscale('log')
+    ax.set_xlabel('Questions in bank')
+    ax.set_ylabel('Time (s)')
+    ax.set_title('Question Bank Scaling')
+    ax.legend()
+    fig.savefig(path, bbox_inches='tight')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark question bank operations at increasing bank sizes")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--bank-dir", default="synthetic_banks")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--build-repeat", type=int, default=3,
+                        help="Runs for load, render_compile and sampler_build (slow on large banks)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the (slower) traced memory measurement")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--plot", help="Save a log-log scaling chart to this image file")
+    parser.add_argument("--baseline", help="Results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--min-delta", type=float, default=0.001, help="Ignore slowdowns smaller than this (seconds)")
+    parser.add_argument("--memory-tolerance", type=float, default=0.1,
+                        help="Allowed growth of load peak memory vs baseline (0.1 = 10%%)")
+    args = parser.parse_args()
+
+    sizes = sorted(args.sizes)
+    report = {"sizes": sizes, "python": sys.version.split()[0], "results": {}}
+    for size in sizes:
+        path = ensure_bank(size, args.bank_dir, seed=args.seed)
+        report["results"][str(size)] = benchmark_bank(path, repeat=args.repeat, build_repeat=args.build_repeat,
+                                                      seed=args.seed, memory=not args.no_memory)
+
+    print(format_report(report))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.plot:
+        plot_report(report, args.plot)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(report, baseline, args.tolerance, args.min_delta, args.memory_tolerance)
+        for size, metric, value, base in regressions:
+            print(f"REGRESSION {metric} @ {size}: {format_value(metric, value)} vs "
+                  f"{format_value(metric, base)} baseline", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
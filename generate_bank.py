@@ -0,0 +1,147 @@
+"""
+Generate synthetic question banks for scaling tests
+
+Produces banks in the same layout as clean_exam_questions.json, with text sampled
+from the bundled bank and an extracted_images folder next to the JSON file:
+
+    python generate_bank.py --sizes 1000 10000 100000 1000000 --out synthetic_banks
+
+Each bank is written to <out>/bank_<size>/, so the app can be pointed at it by
+running it from that directory.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import shutil
+from pathlib import Path
+
+# === CONFIG ===
+SOURCE_JSON = "clean_exam_questions.json"
+SOURCE_IMAGES = "extracted_images"
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+
+# Roughly the shape of the bundled bank
+OPTION_COUNT_WEIGHTS = {4: 0.925, 5: 0.055, 6: 0.02}
+CORRECT_COUNT_WEIGHTS = {1: 0.945, 2: 0.04, 3: 0.015}
+QUESTION_IMAGE_RATE = 0.03
+ANSWER_IMAGE_RATE = 0.007
+MOST_VOTED_RATE = 0.1
+
+
+def load_corpus(source_json=SOURCE_JSON):
+    """Collect question sentences and answer texts from an existing bank"""
+    with open(source_json, 'r', encoding='utf-8') as f:
+        questions = json.load(f)
+
+    sentences = []
+    answers = []
+    for q in questions:
+        sentences.extend(s.strip() for s in re.split(r"(?<=[.?])\s+", q["question_text"]) if s.strip())
+        answers.extend(a.strip() for a in q["answers"].values() if a.strip())
+    return sentences, answers
+
+
+def _weighted(rng, weights):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def generate_question(rng, number, sentences, answers):
+    """Generate one question record in the clean_exam_questions.json layout"""
+    letters = "ABCDEF"[:_weighted(rng, OPTION_COUNT_WEIGHTS)]
+    correct = "".join(sorted(rng.sample(letters, _weighted(rng, CORRECT_COUNT_WEIGHTS))))
+
+    # Finish on a question sentence so the text reads like a real prompt
+    text = " ".join(rng.choices(sentences, k=rng.randint(1, 4)))
+    question_text = text + " " + rng.choice(sentences) + "   "
+
+    answer_texts = {}
+    for letter in letters:
+        answer_text = rng.choice(answers) + "  "
+        if letter in correct and rng.random() < MOST_VOTED_RATE:
+            answer_text += " Most Voted"
+        answer_texts[letter] = answer_text
+
+    top_vote = rng.choice([100, 100, 100, 95, 93, 89, 86, 80, 67, 57, 43])
+    vote = f"{correct} ({top_vote}%)" + (f"{100 - top_vote}%" if top_vote < 100 else "")
+
+    images = []
+    if rng.random() < QUESTION_IMAGE_RATE:
+        images.append(f"{SOURCE_IMAGES}/{number}_1.png")
+    elif rng.random() < ANSWER_IMAGE_RATE:
+        images.extend(f"{SOURCE_IMAGES}/{number}_{letter.lower()}.png" for letter in letters[:4])
+
+    return {
+        "question_number": number,
+        "question_text": question_text,
+        "answers": answer_texts,
+        "correct_answer": correct,
+        "Community vote distribution": vote,
+        "images": images,
+    }
+
+
+def generate_bank(size, seed=0, source_json=SOURCE_JSON):
+    """Generate a list of `size` synthetic question records (deterministic for a seed)"""
+    rng = random.Random(seed)
+    sentences, answers = load_corpus(source_json)
+    return [generate_question(rng, number, sentences, answers) for number in range(1, size + 1)]
+
+
+def write_bank(questions, out_dir, image_files=True, source_images=SOURCE_IMAGES):
+    """
+    Write a bank to out_dir/clean_exam_questions.json
+
+    Image files are hard links to the bundled images (copies where linking is not
+    supported), so even large banks take little extra disk space.
+    """
+    out_dir = Path(out_dir)
+    image_dir = out_dir / SOURCE_IMAGES
+    image_dir.mkdir(parents=True, exist_ok=True)
+
+    with open(out_dir / SOURCE_JSON, "w", encoding="utf-8") as f:
+        json.dump(questions, f, ensure_ascii=False)
+
+    if not image_files:
+        return out_dir
+
+    sources = sorted(p for p in Path(source_images).glob("*.png"))
+    if not sources:
+        return out_dir
+    index = 0
+    for q in questions:
+        for img_path in q["images"]:
+            target = out_dir / img_path
+            if target.exists():
+                continue
+            source = sources[index % len(sources)]
+            index += 1
+            try:
+                os.link(source, target)
+            except OSError:
+                shutil.copyfile(source, target)
+    return out_dir
+
+
+def bank_path(out_root, size):
+    return Path(out_root) / f"bank_{size}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic question banks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--out", default="synthetic_banks", help="Output folder (one sub-folder per size)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--source", default=SOURCE_JSON, help="Bank to sample text from")
+    parser.add_argument("--no-image-files", action="store_true", help="Only reference images, don't create them")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        questions = generate_bank(size, seed=args.seed, source_json=args.source)
+        out_dir = write_bank(questions, bank_path(args.out, size), image_files=not args.no_image_files)
+        print(f"✅ Generated {size} questions in {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+IMAGE_DIR = "extracted_images"
+
+# Image reference -> resolved path. Misses are not stored, so an image added while
+# the app runs is found on the next lookup.
+_resolved_paths = {}
+_path_lookups = {"hits": 0, "misses": 0}
+_path_lock = threading.Lock()
+
+
+def candidate_paths(image_path):
+    """Paths to try for an image reference from the question bank, in order"""
+    # Check if image_path already contains 'extracted_images' and remove it if needed
+    clean_path = image_path
+    if 'extracted_images/' in clean_path:
+        clean_path = clean_path.replace('extracted_images/', '')
+
+    return [
+        Path(IMAGE_DIR) / clean_path,  # Normal path
+        Path(IMAGE_DIR) / clean_path.replace('-', '_'),  # Replace hyphens with underscores
+        Path(IMAGE_DIR) / clean_path.replace('_', '-'),  # Replace underscores with hyphens
+        Path(clean_path),  # Direct path
+        Path(IMAGE_DIR) / f"{clean_path.split('.')[0]}.png"  # Try with png extension
+    ]
+
+
+def resolve_image_path(image_path):
+    """First existing candidate path for an image reference, or None"""
+    resolved = _resolved_paths.get(image_path)
+    with _path_lock:
+        _path_lookups["hits" if resolved is not None else "misses"] += 1
+    if resolved is not None:
+        return resolved
+
+    for path in candidate_paths(image_path):
+        if os.path.exists(path):
+            _resolved_paths[image_path] = str(path)
+            return str(path)
+    return None
+
+
+def path_cache_stats():
+    with _path_lock:
+        hits, misses = _path_lookups["hits"], _path_lookups["misses"]
+    lookups = hits + misses
+    return {"hits": hits, "misses": misses, "hit_rate": hits / lookups if lookups else 0.0}
+
+
+class ImageCache:
+    """
+    Thread-safe, size-bounded LRU cache of image file contents
+
+    Shared by all sessions of the app process. Images are read on first use (or
+    ahead of time via prefetch) and evicted least-recently-used first once the
+    total size exceeds budget_bytes. Files larger than the budget are never cached.
+    """
+
+    def __init__(self, budget_bytes, prefetch_workers=1):
+        self.budget_bytes = budget_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=prefetch_workers, thread_name_prefix="image-prefetch")
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.prefetched = 0
+
+    def get(self, image_path):
+        """
+        Bytes of a question bank image, from memory if cached
+
+        Returns:
+        - The image bytes, or None if the image can't be found
+        """
+        path = resolve_image_path(image_path)
+        if path is None:
+            return None
+
+        with self._lock:
+            data = self._entries.get(path)
+            if data is not None:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return data
+            self.misses += 1
+
+        return self._load(path)[0]
+
+    def prefetch(self, image_paths):
+        """Load images into the cache on a background thread"""
+        for image_path in image_paths:
+            self._executor.submit(self._prefetch_one, image_path)
+
+    def _prefetch_one(self, image_path):
+        path = resolve_image_path(image_path)
+        if path is None:
+            return
+        with self._lock:
+            if path in self._entries:
+                # Already cached: mark it recently used so it survives until it's shown
+                self._entries.move_to_end(path)
+                return
+        if self._load(path)[1]:
+            with self._lock:
+                self.prefetched += 1
+
+    def _load(self, path):
+        """
+        Read an image and cache it if it fits the budget
+
+        Returns:
+        - (data, inserted): the bytes (None if unreadable) and whether this call
+          added them to the cache
+        """
+        # Disk reads happen outside the lock so sessions don't wait on each other
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None, False
+
+        if len(data) > self.budget_bytes:
+            return data, False
+
+        inserted = False
+        with self._lock:
+            if path not in self._entries:
+                self._entries[path] = data
+                self._size += len(data)
+                inserted = True
+            self._entries.move_to_end(path)
+            while self._size > self.budget_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+        return data, inserted
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "budget_bytes": self.budget_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "prefetched": self.prefetched,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
@@ -0,0 +1,204 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+
+# Histogram bucket upper bounds in seconds (Prometheus "le" labels)
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Sessions that haven't rerun for this long no longer count as active
+SESSION_TIMEOUT = 300
+
+
+class _SectionStats:
+    __slots__ = ("count", "total", "max", "last", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+
+
+class Metrics:
+    """
+    Process-wide timings of app sections, per page
+
+    Sections are timed with `timer(name)` or the `timed(name)` decorator and are
+    attributed to the page of the rerun running on the current thread (Streamlit
+    runs each session's script on its own thread). Timings are inclusive, so a
+    section that calls another one also counts the inner section's time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._sections = {}
+        self._sessions = {}
+        self._gauges = {}
+        self._last_export = 0.0
+        self.started = time.time()
+
+    def begin_rerun(self, session_id, page=""):
+        now = time.time()
+        self._local.page = page
+        self._local.rerun_start = time.perf_counter()
+        with self._lock:
+            self._sessions[session_id] = now
+
+    def set_page(self, page):
+        self._local.page = page
+
+    def end_rerun(self):
+        start = getattr(self._local, "rerun_start", None)
+        if start is not None:
+            self.record("rerun", time.perf_counter() - start)
+            self._local.rerun_start = None
+
+    def record(self, section, seconds):
+        key = (getattr(self._local, "page", ""), section)
+        with self._lock:
+            stats = self._sections.get(key)
+            if stats is None:
+                stats = self._sections[key] = _SectionStats()
+            stats.add(seconds)
+
+    @contextmanager
+    def timer(self, section):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(section, time.perf_counter() - start)
+
+    def timed(self, section):
+        """Decorator form of timer()"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(section, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def set_gauges(self, prefix, values):
+        """Record numeric values such as cache statistics under prefix_<name>"""
+        with self._lock:
+            for name, value in values.items():
+                self._gauges[f"{prefix}_{name}"] = value
+
+    def active_sessions(self):
+        cutoff = time.time() - SESSION_TIMEOUT
+        with self._lock:
+            for session_id in [s for s, seen in self._sessions.items() if seen < cutoff]:
+                del self._sessions[session_id]
+            return len(self._sessions)
+
+    def snapshot(self):
+        """Plain-dict copy of all metrics"""
+        active = self.active_sessions()
+        with self._lock:
+            sections = [
+                {
+                    "page": page,
+                    "section": section,
+                    "count": stats.count,
+                    "total_seconds": stats.total,
+                    "mean_seconds": stats.total / stats.count,
+                    "max_seconds": stats.max,
+                    "last_seconds": stats.last,
+                    "buckets": list(stats.buckets),
+                }
+                for (page, section), stats in sorted(self._sections.items())
+            ]
+            gauges = dict(self._gauges)
+        return {"timestamp": time.time(), "active_sessions": active, "gauges": gauges, "sections": sections}
+
+    def to_prometheus(self, snapshot=None):
+        """Render a snapshot in the Prometheus text exposition format"""
+        snapshot = snapshot or self.snapshot()
+        lines = [
+            "# HELP app_section_seconds Time spent in app sections per page",
+            "# TYPE app_section_seconds histogram",
+        ]
+        for entry in snapshot["sections"]:
+            labels = f'page="{_escape(entry["page"])}",section="{_escape(entry["section"])}"'
+            cumulative = 0
+            for bound, count in zip(BUCKETS, entry["buckets"]):
+                cumulative += count
+                lines.append(f'app_section_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'app_section_seconds_bucket{{{labels},le="+Inf"}} {entry["count"]}')
+            lines.append(f'app_section_seconds_sum{{{labels}}} {entry["total_seconds"]}')
+            lines.append(f'app_section_seconds_count{{{labels}}} {entry["count"]}')
+
+        lines.append("# HELP app_section_max_seconds Slowest observed time per section")
+        lines.append("# TYPE app_section_max_seconds gauge")
+        for entry in snapshot["sections"]:
+            labels = f'page="{_escape(entry["page"])}",section="{_escape(entry["section"])}"'
+            lines.append(f'app_section_max_seconds{{{labels}}} {entry["max_seconds"]}')
+
+        lines.append("# TYPE app_active_sessions gauge")
+        lines.append(f'app_active_sessions {snapshot["active_sessions"]}')
+        for name, value in sorted(snapshot["gauges"].items()):
+            lines.append(f"# TYPE app_{name} gauge")
+            lines.append(f"app_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def maybe_export(self, directory, interval, max_jsonl_bytes=10 * 1024 * 1024):
+        """
+        Write metrics.prom (replaced) and metrics.jsonl (appended) to directory if
+        at least `interval` seconds passed since the last export
+
+        Once metrics.jsonl exceeds max_jsonl_bytes it is moved to metrics.jsonl.1
+        (replacing the previous one) and a new file is started. Write errors are
+        ignored so an unwritable directory never breaks a rerun.
+
+        Returns:
+        - True if the metrics were written
+        """
+        now = time.time()
+        with self._lock:
+            if not directory or now - self._last_export < interval:
+                return False
+            self._last_export = now
+
+        snapshot = self.snapshot()
+        try:
+            os.makedirs(directory, exist_ok=True)
+            prom_path = os.path.join(directory, "metrics.prom")
+            # Write then rename, so a scraper never reads a half-written file
+            with open(prom_path + ".tmp", "w") as f:
+                f.write(self.to_prometheus(snapshot))
+            os.replace(prom_path + ".tmp", prom_path)
+
+            jsonl_path = os.path.join(directory, "metrics.jsonl")
+            if os.path.exists(jsonl_path) and os.path.getsize(jsonl_path) > max_jsonl_bytes:
+                os.replace(jsonl_path, jsonl_path + ".1")
+            with open(jsonl_path, "a") as f:
+                f.write(json.dumps(snapshot) + "\n")
+        except OSError:
+            return False
+        return True
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Shared by every session of the app process
+metrics = Metrics()
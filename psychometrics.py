@@ -0,0 +1,194 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from question_model import ANSWER_LETTERS, answer_to_mask
+
+# Columns every attempt log must provide (extra columns are ignored)
+REQUIRED_COLUMNS = ["learner_id", "question_number", "selected_answer"]
+
+
+def load_attempts(source, file_format=None):
+    """
+    Load quiz attempt records from CSV, JSONL or Parquet
+
+    Parameters:
+    - source: A path or a file-like object (e.g. a Streamlit upload) with a .name
+    - file_format: "csv", "jsonl" or "parquet"; inferred from the file name if omitted
+
+    Returns:
+    - A DataFrame with at least the REQUIRED_COLUMNS
+    """
+    if file_format is None:
+        name = getattr(source, "name", source)
+        file_format = Path(str(name)).suffix.lstrip(".").lower()
+
+    if file_format == "csv":
+        attempts = pd.read_csv(source, dtype={"selected_answer": "string"})
+    elif file_format in ("jsonl", "ndjson"):
+        attempts = pd.read_json(source, lines=True, dtype={"selected_answer": "string"})
+    elif file_format == "parquet":
+        # Parquet needs pyarrow (or fastparquet); pandas raises a clear ImportError otherwise
+        attempts = pd.read_parquet(source)
+    else:
+        raise ValueError(f"Unsupported attempt log format: {file_format!r}")
+
+    missing = [col for col in REQUIRED_COLUMNS if col not in attempts.columns]
+    if missing:
+        raise ValueError(f"Attempt log is missing columns: {', '.join(missing)}")
+    return attempts
+
+
+class AnswerMatrix:
+    """
+    Dense learner x question view of an attempt log
+
+    - selected: uint8 bitmask of the chosen answer(s), 0 where not answered
+    - answered: bool, True where the learner answered the question
+    - correct: bool, True where the selection equals the answer key
+    - letters: option letters used by the matrix's questions, in ANSWER_LETTERS order
+    """
+
+    def __init__(self, learners, question_numbers, selected, answered, key, letters=ANSWER_LETTERS):
+        self.learners = learners
+        self.question_numbers = question_numbers
+        self.selected = selected
+        self.answered = answered
+        self.key = key
+        self.letters = letters
+        self.correct = answered & (selected == key[np.newaxis, :])
+
+
+def build_answer_matrix(attempts, questions):
+    """
+    Turn long-format attempt records into an AnswerMatrix
+
+    Parameters:
+    - attempts: DataFrame as returned by load_attempts
+    - questions: The question bank (list of Question objects)
+
+    Returns:
+    - An AnswerMatrix with one column per bank question that appears in the log
+      (the first one if several share a number). Records with no learner_id or
+      question_number, or for questions not in the bank, are dropped; if a
+      learner answered the same question more than once, the last record wins.
+    """
+    # Records without a learner or question can't be placed in the matrix
+    attempts = attempts.dropna(subset=["learner_id", "question_number"])
+    attempts = attempts.drop_duplicates(["learner_id", "question_number"], keep="last")
+
+    # Logs usually cover a small part of a large bank, so only those questions get a column
+    bank_numbers = pd.Index([q.number for q in questions])
+    used = bank_numbers.isin(attempts["question_number"]) & ~bank_numbers.duplicated()
+    used_questions = [q for q, keep in zip(questions, used) if keep]
+    question_numbers = bank_numbers[used]
+    key = np.array([q.correct_mask for q in used_questions], dtype=np.uint8)
+    option_letters = {letter for q in used_questions for letter in q.options}
+    letters = "".join(letter for letter in ANSWER_LETTERS if letter in option_letters)
+
+    cols = question_numbers.get_indexer(attempts["question_number"])
+    in_bank = cols >= 0
+    cols = cols[in_bank]
+
+    rows, learners = pd.factorize(attempts["learner_id"].to_numpy()[in_bank])
+
+    # Only the distinct answer strings go through Python; everything else is vectorised
+    answer_codes, answer_values = pd.factorize(attempts["selected_answer"].to_numpy()[in_bank])
+    # The trailing 0 is what missing answers (code -1) map to
+    answer_masks = np.array([answer_to_mask(a) for a in answer_values] + [0], dtype=np.uint8)
+    masks = answer_masks[answer_codes]
+
+    shape = (len(learners), len(question_numbers))
+    selected = np.zeros(shape, dtype=np.uint8)
+    answered = np.zeros(shape, dtype=bool)
+    selected[rows, cols] = masks
+    answered[rows, cols] = masks > 0
+
+    return AnswerMatrix(pd.Index(learners, name="learner_id"), question_numbers, selected, answered, key, letters)
+
+
+def item_statistics(matrix):
+    """
+    Per-question difficulty and discrimination
+
+    - responses: number of learners who answered the question
+    - difficulty: proportion answering correctly (classical p-value; higher is easier)
+    - discrimination: point-biserial correlation between getting the item right
+      and the learner's score on the rest of the items they answered
+
+    Returns:
+    - A DataFrame indexed by question number
+    """
+    # Work on the answered cells only, so memory follows the number of responses
+    # rather than learners x questions
+    rows, cols = np.nonzero(matrix.answered)
+    right = matrix.correct[rows, cols].astype(np.float64)
+
+    # Rest score: proportion correct on the other answered items (0 if there are none)
+    others = matrix.answered.sum(axis=1)[rows] - 1
+    others_right = matrix.correct.sum(axis=1)[rows] - right
+    rest = np.divide(others_right, others, out=np.zeros_like(right), where=others > 0)
+
+    n_items = len(matrix.question_numbers)
+    responses = np.bincount(cols, minlength=n_items).astype(np.float64)
+    n_right = np.bincount(cols, weights=right, minlength=n_items)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        difficulty = n_right / responses
+        mean_all = np.bincount(cols, weights=rest, minlength=n_items) / responses
+        mean_right = np.bincount(cols, weights=rest * right, minlength=n_items) / n_right
+        std_all = np.sqrt(np.bincount(cols, weights=rest ** 2, minlength=n_items) / responses - mean_all ** 2)
+        discrimination = (mean_right - mean_all) / std_all * np.sqrt(difficulty / (1 - difficulty))
+
+    discrimination[~np.isfinite(discrimination)] = np.nan
+    return pd.DataFrame({
+        "responses": responses.astype(np.int64),
+        "difficulty": difficulty,
+        "discrimination": discrimination,
+    }, index=pd.Index(matrix.question_numbers, name="question_number"))
+
+
+def distractor_rates(matrix, letters=None):
+    """
+    Share of answering learners who selected each option, per question
+
+    Parameters:
+    - matrix: An AnswerMatrix
+    - letters: Answer letters to report; defaults to the options of the matrix's questions
+
+    Returns:
+    - A DataFrame indexed by question number with one column per answer letter
+    """
+    if letters is None:
+        letters = matrix.letters
+    responses = matrix.answered.sum(axis=0).astype(np.float64)
+    rates = {}
+    for letter in letters:
+        bit = np.uint8(1 << ANSWER_LETTERS.index(letter))
+        chosen = ((matrix.selected & bit) > 0).sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rates[letter] = chosen / responses
+    return pd.DataFrame(rates, index=pd.Index(matrix.question_numbers, name="question_number"))
+
+
+def topic_mastery(matrix, question_topics):
+    """
+    Proportion correct per learner and topic
+
+    Parameters:
+    - matrix: An AnswerMatrix
+    - question_topics: Mapping of question number to topic name
+
+    Returns:
+    - A DataFrame indexed by learner with one column per topic (NaN where the
+      learner answered nothing in that topic)
+    """
+    topics = pd.Series(matrix.question_numbers.map(lambda n: question_topics.get(n, "Other")))
+    one_hot = pd.get_dummies(topics).astype(np.float64)
+
+    # (learners x questions) @ (questions x topics)
+    answered = matrix.answered.astype(np.float64) @ one_hot.to_numpy()
+    correct = matrix.correct.astype(np.float64) @ one_hot.to_numpy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mastery = correct / answered
+    return pd.DataFrame(mastery, index=matrix.learners, columns=one_hot.columns)
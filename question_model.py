@@ -0,0 +1,245 @@
+import json
+import os
+import re
+import sys
+from types import MappingProxyType
+
+TOPICS = ["Machine Learning", "BigQuery", "Database", "Cloud Storage", "Data Processing"]
+
+CONSENSUS_LEVELS = [
+    "Strong Consensus (90-100%)",
+    "Moderate Consensus (70-89%)",
+    "Split Opinion (50-69%)",
+    "Highly Debated (<50%)",
+]
+
+# Community consensus doubles as a difficulty estimate until real attempt data exists
+DIFFICULTIES = ["Easy", "Medium", "Hard"]
+_CONSENSUS_DIFFICULTY = {
+    "Strong Consensus (90-100%)": "Easy",
+    "Moderate Consensus (70-89%)": "Medium",
+    "Split Opinion (50-69%)": "Hard",
+    "Highly Debated (<50%)": "Hard",
+}
+
+_VOTE_PERCENTAGE = re.compile(r"(\d+)%")
+
+# Answer letters are stored as bits of an int (A=1, B=2, C=4, ...)
+ANSWER_LETTERS = "ABCDEFGH"
+
+
+def answer_to_mask(answer):
+    """
+    Encode an answer string such as "C" or "BD" as a bitmask (order-insensitive).
+    Unknown characters are ignored, so "b, d" and "DB" both encode to the same mask.
+    """
+    mask = 0
+    for letter in str(answer or "").upper():
+        bit = ANSWER_LETTERS.find(letter)
+        if bit >= 0:
+            mask |= 1 << bit
+    return mask
+
+
+def classify_topic(question_text):
+    """
+    Assign a question to a single topic using simple keyword rules
+    (simplified topic extraction - in real implementation would be more sophisticated)
+    """
+    text = question_text.lower()
+    if "machine learning" in text or "model" in text or "train" in text:
+        return "Machine Learning"
+    elif "bigquery" in text:
+        return "BigQuery"
+    elif "database" in text or "sql" in text or "table" in text:
+        return "Database"
+    elif "storage" in text or "bucket" in text:
+        return "Cloud Storage"
+    elif "dataflow" in text or "dataproc" in text or "processing" in text:
+        return "Data Processing"
+    else:
+        return "Other"
+
+
+# PDF ligatures and typographic quotes force CPython to store the whole string at
+# 2 bytes per character; folding them keeps most text in the compact 1-byte form
+# (and lets a search for "fit" match text extracted as "ﬁt")
+TEXT_FOLDING = str.maketrans({
+    "\ufb00": "ff", "\ufb01": "fi", "\ufb02": "fl", "\ufb03": "ffi", "\ufb04": "ffl",
+    "\u2018": "'", "\u2019": "'", "\u201c": '"', "\u201d": '"',
+})
+
+# Shared instances for values that repeat across most questions
+_NO_ANSWER_IMAGES = MappingProxyType({})
+_option_tuples = {}
+
+
+def fold_text(text):
+    return text.translate(TEXT_FOLDING)
+
+
+def consensus_level(vote):
+    """Consensus level of a community vote string like "B (95%)5%", or None if unknown"""
+    # Extract the first percentage if it exists
+    match = _VOTE_PERCENTAGE.search(vote or "")
+    if not match:
+        return None
+    percentage = int(match.group(1))
+    if percentage >= 90:
+        return "Strong Consensus (90-100%)"
+    elif percentage >= 70:
+        return "Moderate Consensus (70-89%)"
+    elif percentage >= 50:
+        return "Split Opinion (50-69%)"
+    else:
+        return "Highly Debated (<50%)"
+
+
+def difficulty_of(question):
+    """Easy/Medium/Hard estimate from community consensus (Medium when there is no vote)"""
+    return _CONSENSUS_DIFFICULTY.get(consensus_level(question.community_vote), "Medium")
+
+
+def clean_answer_text(answer_text):
+    # Remove 'Most Voted' tag from answer text for fairness
+    return answer_text.replace(' Most Voted', '').replace('Most Voted', '').strip()
+
+
+def partition_images(images):
+    """
+    Split image paths into question images and per-answer images
+
+    Answer images are recognised by a letter suffix on the filename (like "44_a.png").
+
+    Returns:
+    - (question_images, answer_images) where answer_images maps "A" -> (paths, ...)
+    """
+    question_images = []
+    answer_images = {}
+    for img_path in images:
+        # Extract the base filename without path
+        filename = os.path.basename(img_path) if "/" in img_path else img_path
+        base_name = filename.split('.')[0]  # Remove extension
+
+        # Check if the filename has a letter suffix (like "44_a")
+        if len(base_name) > 2 and base_name[-2] == '_' and base_name[-1].isalpha():
+            answer_letter = sys.intern(base_name[-1].upper())
+            answer_images.setdefault(answer_letter, []).append(img_path)
+        else:
+            question_images.append(img_path)
+    if not answer_images:
+        return tuple(question_images), _NO_ANSWER_IMAGES
+    return tuple(question_images), MappingProxyType({letter: tuple(paths) for letter, paths in answer_images.items()})
+
+
+class Question:
+    """
+    Read-only question built once at load time from a raw JSON record
+
+    Answer text is already stripped of the 'Most Voted' tag, the correct answer is
+    pre-encoded as a bitmask and images are pre-split into question/answer groups,
+    so grading and rendering don't repeat that work on every rerun.
+    """
+
+    __slots__ = (
+        "number", "text", "options", "answer_texts", "correct_answer", "correct_mask",
+        "is_multiple_choice", "community_vote", "images", "question_images",
+        "answer_images", "topic",
+    )
+
+    def __init__(self, raw):
+        intern = sys.intern
+        self.number = raw.get("question_number")
+        raw_text = raw.get("question_text", "")
+        self.text = fold_text(raw_text)
+        answers = raw.get("answers") or {}
+        # Option letters in the original order; the tuple itself is shared between
+        # questions with the same options (almost always A-D)
+        options = tuple(intern(letter) for letter in answers)
+        self.options = _option_tuples.setdefault(options, options)
+        self.answer_texts = tuple(fold_text(clean_answer_text(text)) for text in answers.values())
+        self.correct_answer = intern(raw.get("correct_answer") or "")
+        self.correct_mask = answer_to_mask(self.correct_answer)
+        # Check if the correct answer has multiple letters (like "AB" or "BCD")
+        self.is_multiple_choice = len(self.correct_answer) > 1
+        vote = raw.get("Community vote distribution")
+        self.community_vote = intern(vote) if vote else None
+        self.images = tuple(intern(path) for path in raw.get("images") or ())
+        self.question_images, self.answer_images = partition_images(self.images)
+        # Classified on the unfolded text so topic assignments match the keyword rules
+        # as they have always been applied to the bank
+        self.topic = intern(classify_topic(raw_text))
+
+    @property
+    def answers(self):
+        """(letter, cleaned answer text) pairs in the original option order"""
+        return zip(self.options, self.answer_texts)
+
+    def is_correct(self, user_answer):
+        # Order-insensitive comparison, so "BA" matches "AB"
+        return bool(user_answer) and answer_to_mask(user_answer) == self.correct_mask
+
+    def __repr__(self):
+        return f"Question({self.number!r})"
+
+
+def build_questions(raw_questions):
+    """Build Question objects from the raw JSON records"""
+    return [Question(raw) for raw in raw_questions]
+
+
+def load_question_file(path):
+    """Load a question bank in the clean_exam_questions.json layout"""
+    with open(path, 'r') as f:
+        return build_questions(json.load(f))
+
+
+def filter_questions(questions, search_term="", topic="All"):
+    """
+    Filter questions the way the Browse page does
+
+    Parameters:
+    - questions: List of Question objects
+    - search_term: Case-insensitive substring of the question text ("" for no search)
+    - topic: Topic keyword to look for in the question text, or "All"
+    """
+    filtered_questions = questions
+    if search_term:
+        filtered_questions = [q for q in filtered_questions if search_term.lower() in q.text.lower()]
+
+    if topic != "All":
+        # Simplified topic filtering (in real app, would need to extract topics from questions)
+        filtered_questions = [q for q in filtered_questions if topic.lower() in q.text.lower()]
+    return filtered_questions
+
+
+def question_statistics(questions):
+    """
+    Aggregate the counts shown on the Statistics page
+
+    Returns:
+    - Dict with "topics", "consensus" and "answers" count dicts and the number of
+      questions "with_images"
+    """
+    topics = dict.fromkeys(TOPICS + ["Other"], 0)
+    consensus = dict.fromkeys(CONSENSUS_LEVELS, 0)
+    answers = {"A": 0, "B": 0, "C": 0, "D": 0, "Multiple": 0}
+    with_images = 0
+
+    for q in questions:
+        topics[q.topic] += 1
+
+        level = consensus_level(q.community_vote)
+        if level is not None:
+            consensus[level] += 1
+
+        correct = q.correct_answer
+        if len(correct) == 1 and correct in answers:
+            answers[correct] += 1
+        else:
+            answers["Multiple"] += 1
+
+        if q.images:
+            with_images += 1
+
+    return {"topics": topics, "consensus": consensus, "answers": answers, "with_images": with_images}
@@ -0,0 +1,173 @@
+import math
+import random
+
+from question_model import difficulty_of
+
+
+class Blueprint:
+    """
+    Target make-up of a quiz
+
+    - topic_weights: Topic -> relative weight; topics left out (or weighted 0) are
+      not drawn. None keeps the bank's own topic mix.
+    - difficulty_weights: Difficulty -> relative weight, or None for the bank mix
+    - multi_answer_ratio: Share of multi-answer questions (0-1), or None for the bank mix
+    - exclude: Questions from the bank that must not be drawn (e.g. recently seen).
+      They are matched by identity, so questions sharing a number stay distinct.
+    - seed: Random seed; None picks one, which is returned so the quiz can be redrawn
+      (the same seed and exclusions always give the same quiz)
+    """
+
+    def __init__(self, topic_weights=None, difficulty_weights=None, multi_answer_ratio=None,
+                 exclude=(), seed=None):
+        self.topic_weights = topic_weights
+        self.difficulty_weights = difficulty_weights
+        self.multi_answer_ratio = multi_answer_ratio
+        self.exclude = exclude
+        self.seed = seed
+
+
+class QuizSampler:
+    """
+    Stratified quiz sampling over pools precomputed at load time
+
+    Questions are bucketed once by (topic, difficulty, multi-answer). Drawing a quiz
+    allocates the k questions across those cells from the blueprint and then draws
+    inside each cell, so the cost depends on k and the number of cells, not on the
+    size of the bank.
+    """
+
+    def __init__(self, questions):
+        self.questions = questions
+        self._pools = {}
+        self._cell_of = {}
+        for index, q in enumerate(questions):
+            cell = (q.topic, difficulty_of(q), q.is_multiple_choice)
+            self._pools.setdefault(cell, []).append(index)
+            self._cell_of[q] = (cell, index)
+
+        total = len(questions) or 1
+        self.topic_shares = self._shares(0, total)
+        self.difficulty_shares = self._shares(1, total)
+        self.multi_answer_share = self._shares(2, total).get(True, 0.0)
+
+    def _shares(self, position, total):
+        shares = {}
+        for cell, pool in self._pools.items():
+            shares[cell[position]] = shares.get(cell[position], 0) + len(pool) / total
+        return shares
+
+    def _cell_weights(self, blueprint):
+        """Bank share of each cell, reweighted to the blueprint's marginals"""
+        topic_weights = _normalised(blueprint.topic_weights)
+        difficulty_weights = _normalised(blueprint.difficulty_weights)
+        multi_weights = None
+        if blueprint.multi_answer_ratio is not None:
+            multi_weights = {True: blueprint.multi_answer_ratio, False: 1 - blueprint.multi_answer_ratio}
+
+        total = len(self.questions)
+        weights = {}
+        for cell, pool in self._pools.items():
+            topic, difficulty, is_multi = cell
+            weight = len(pool) / total
+            if topic_weights is not None:
+                weight *= topic_weights.get(topic, 0.0) / self.topic_shares[topic]
+            if difficulty_weights is not None:
+                weight *= difficulty_weights.get(difficulty, 0.0) / self.difficulty_shares[difficulty]
+            if multi_weights is not None:
+                share = self.multi_answer_share if is_multi else 1 - self.multi_answer_share
+                weight *= multi_weights[is_multi] / share
+            if weight > 0:
+                weights[cell] = weight
+        return weights
+
+    def _allocate(self, rng, k, weights, capacity):
+        """
+        Split k draws across cells in proportion to weight without exceeding capacity
+
+        Each cell's quota k * w / sum(w) is rounded up or down at random with the
+        probability of its fractional part (systematic sampling, so the counts always
+        add up to k). This keeps small cells at their expected share across quizzes
+        instead of handing every leftover draw to the largest cells. Draws a full
+        cell can't take are spread over the cells that still have room.
+        """
+        allocation = dict.fromkeys(weights, 0)
+        active = [cell for cell in weights if capacity[cell] > 0]
+        remaining = k
+        while remaining > 0 and active:
+            total = sum(weights[cell] for cell in active)
+            offset = rng.random()
+            cumulative = 0.0
+            taken_before = 0
+            overflow = 0
+            for position, cell in enumerate(active):
+                cumulative += remaining * weights[cell] / total
+                if position == len(active) - 1:
+                    cumulative = remaining  # guard against float drift on the last cell
+                # Number of points offset, offset + 1, ... at or below cumulative
+                taken = max(0, math.floor(cumulative - offset) + 1)
+                n = taken - taken_before
+                taken_before = taken
+                fits = min(n, capacity[cell] - allocation[cell])
+                allocation[cell] += fits
+                overflow += n - fits
+            remaining = overflow
+            active = [cell for cell in active if capacity[cell] > allocation[cell]]
+        return allocation
+
+    def sample(self, k, blueprint=None):
+        """
+        Draw up to k questions matching the blueprint
+
+        Returns:
+        - (questions, seed): the drawn Question objects in random order and the seed
+          that reproduces them. Fewer than k questions are returned only if the
+          blueprint doesn't allow enough questions.
+        """
+        blueprint = blueprint or Blueprint()
+        seed = blueprint.seed if blueprint.seed is not None else random.randrange(2 ** 32)
+        rng = random.Random(seed)
+
+        # Excluded questions per cell, so capacity is known without scanning pools
+        excluded = {}
+        for question in blueprint.exclude:
+            if question in self._cell_of:
+                cell, index = self._cell_of[question]
+                excluded.setdefault(cell, set()).add(index)
+
+        weights = self._cell_weights(blueprint)
+        capacity = {cell: len(self._pools[cell]) - len(excluded.get(cell, ())) for cell in weights}
+        # Iterate cells in a fixed order so a seed always gives the same quiz
+        allocation = self._allocate(rng, k, dict(sorted(weights.items(), key=lambda item: str(item[0]))), capacity)
+
+        drawn = []
+        for cell, n in allocation.items():
+            if n:
+                drawn.extend(_draw(rng, self._pools[cell], n, excluded.get(cell, set())))
+        rng.shuffle(drawn)
+        return [self.questions[index] for index in drawn], seed
+
+
+def _normalised(weights):
+    if weights is None:
+        return None
+    total = sum(weights.values())
+    if total <= 0:
+        return {key: 0.0 for key in weights}
+    return {key: value / total for key, value in weights.items()}
+
+
+def _draw(rng, pool, n, excluded):
+    """n distinct indices from pool, skipping excluded ones"""
+    if (n + len(excluded)) * 2 >= len(pool):
+        # Small or mostly used-up pool: filtering is cheaper than rejection
+        return rng.sample([index for index in pool if index not in excluded], n)
+
+    chosen = set()
+    drawn = []
+    while len(drawn) < n:
+        index = pool[rng.randrange(len(pool))]
+        if index not in excluded and index not in chosen:
+            chosen.add(index)
+            drawn.append(index)
+    return drawn
@@ -0,0 +1,94 @@
+from functools import lru_cache
+from html import escape
+
+# Compiled models kept in memory, least recently used dropped first. Large enough
+# for the bundled bank, small enough that a large bank doesn't keep a second,
+# escaped copy of all its text.
+RENDER_CACHE_SIZE = 2048
+
+
+class AnswerBlock:
+    """Consecutive answer options rendered as one HTML fragment, followed by the last option's images"""
+
+    __slots__ = ("html", "images_label", "images")
+
+    def __init__(self, html, images_label=None, images=()):
+        self.html = html
+        self.images_label = images_label
+        self.images = images
+
+
+class RenderModel:
+    """
+    Everything display_single_question needs for one question, compiled once
+
+    HTML fragments are pre-formatted with the question text escaped, so rendering
+    a question only emits these fragments, its images and the answer widgets.
+    Widget keys use the identity of the (shared, cached) Question, which stays
+    unique when question numbers are duplicated or missing.
+    """
+
+    __slots__ = (
+        "number", "expander_label", "intro_html", "question_images", "options",
+        "widget", "answer_blocks", "correct_html", "show_answer_key",
+    )
+
+    def __init__(self, question):
+        number = question.number if question.number is not None else ''
+        self.number = question.number
+        self.expander_label = f"Question {question.number}: {question.text[:100]}..."
+        self.intro_html = f"""
+    <div class="question-card">
+        <h3>Question {number}</h3>
+    </div>
+    <p class='question-text'>{escape(question.text)}</p>
+    """
+        self.question_images = question.question_images
+        self.options = question.options
+        # Multi-answer questions use checkboxes, single-answer ones a radio group
+        self.widget = "checkbox" if question.is_multiple_choice else "radio"
+
+        # Merge options into as few fragments as possible, splitting only where an
+        # answer has images that must appear right after it
+        blocks = []
+        pending = []
+        for option, answer_text in question.answers:
+            pending.append(f"""
+    <div class='answer-option'>
+        <strong>{option}:</strong> {escape(answer_text)}
+    </div>
+    """)
+            images = question.answer_images.get(option, ())
+            if images:
+                blocks.append(AnswerBlock("".join(pending), f"**Answer {option} Images:**", images))
+                pending = []
+        if pending:
+            blocks.append(AnswerBlock("".join(pending)))
+        self.answer_blocks = tuple(blocks)
+
+        correct_html = f"<div class='correct-answer'><strong>Correct Answer: {escape(question.correct_answer)}</strong></div>"
+        if question.community_vote is not None:
+            correct_html += f"<div class='community-vote'>Community vote: {escape(question.community_vote)}</div>"
+        self.correct_html = correct_html
+        self.show_answer_key = f"show_answer_{id(question)}"
+
+    def __setattr__(self, name, value):
+        if hasattr(self, name):
+            raise AttributeError(f"RenderModel.{name} is read-only")
+        object.__setattr__(self, name, value)
+
+    def __repr__(self):
+        return f"RenderModel({self.number!r})"
+
+
+@lru_cache(maxsize=RENDER_CACHE_SIZE)
+def render_model(question):
+    """RenderModel for a question, compiled on first use and cached"""
+    return RenderModel(question)
+
+
+def render_cache_stats():
+    info = render_model.cache_info()
+    lookups = info.hits + info.misses
+    return {"entries": info.currsize, "hits": info.hits, "misses": info.misses,
+            "hit_rate": info.hits / lookups if lookups else 0.0}
@@ -0,0 +1,84 @@
+from collections import Counter
+
+import pytest
+
+from question_model import DIFFICULTIES, Question, difficulty_of, load_question_file
+from quiz_sampler import Blueprint, QuizSampler
+
+SEEDS = range(1, 200)
+
+
+@pytest.fixture(scope="module")
+def sampler():
+    return QuizSampler(load_question_file("clean_exam_questions.json"))
+
+
+def default_blueprint(sampler, **kwargs):
+    # What the sidebar sends before the user touches any slider
+    return Blueprint(
+        topic_weights={topic: round(share * 100) for topic, share in sampler.topic_shares.items()},
+        difficulty_weights={difficulty: round(sampler.difficulty_shares[difficulty] * 100)
+                            for difficulty in DIFFICULTIES},
+        multi_answer_ratio=round(sampler.multi_answer_share * 100) / 100,
+        **kwargs
+    )
+
+
+@pytest.mark.parametrize("k", [10, 20, 50])
+def test_shares_follow_blueprint_across_seeds(sampler, k):
+    blueprint = default_blueprint(sampler)
+    topics, difficulties, multi, drawn = Counter(), Counter(), 0, 0
+    for seed in SEEDS:
+        blueprint.seed = seed
+        quiz, _ = sampler.sample(k, blueprint)
+        assert len(quiz) == k
+        drawn += len(quiz)
+        topics.update(q.topic for q in quiz)
+        difficulties.update(difficulty_of(q) for q in quiz)
+        multi += sum(q.is_multiple_choice for q in quiz)
+
+    topic_total = sum(blueprint.topic_weights.values())
+    for topic, weight in blueprint.topic_weights.items():
+        assert topics[topic] / drawn == pytest.approx(weight / topic_total, abs=0.02)
+    difficulty_total = sum(blueprint.difficulty_weights.values())
+    for difficulty, weight in blueprint.difficulty_weights.items():
+        assert difficulties[difficulty] / drawn == pytest.approx(weight / difficulty_total, abs=0.02)
+    assert multi / drawn == pytest.approx(blueprint.multi_answer_ratio, abs=0.015)
+
+
+def test_skewed_blueprint(sampler):
+    blueprint = Blueprint(topic_weights={"BigQuery": 1, "Cloud Storage": 1},
+                          difficulty_weights={"Hard": 1}, multi_answer_ratio=0.0)
+    for seed in SEEDS:
+        blueprint.seed = seed
+        quiz, _ = sampler.sample(10, blueprint)
+        assert {q.topic for q in quiz} <= {"BigQuery", "Cloud Storage"}
+        assert all(difficulty_of(q) == "Hard" and not q.is_multiple_choice for q in quiz)
+
+
+def test_all_multi_answer_quiz_is_cut_short(sampler):
+    # With ratio 1.0 only multi-answer cells are eligible, so the quiz stops once they run out
+    multi_available = sum(q.is_multiple_choice for q in sampler.questions)
+    quiz, _ = sampler.sample(50, Blueprint(multi_answer_ratio=1.0, seed=3))
+    assert sum(q.is_multiple_choice for q in quiz) == multi_available
+    assert len(quiz) == multi_available
+
+
+def test_seed_and_exclusions_reproduce_quiz(sampler):
+    excluded = set(sampler.questions[:100])
+    first, seed = sampler.sample(20, default_blueprint(sampler, exclude=excluded))
+    again, _ = sampler.sample(20, default_blueprint(sampler, exclude=excluded, seed=seed))
+    assert first == again
+    assert not excluded & set(first)
+    assert len(set(first)) == 20
+
+
+def test_exclusions_keep_questions_sharing_a_number_apart():
+    first, second = load_question_file("clean_exam_questions.json")[:2]
+    twin = Question({"question_number": first.number, "question_text": "Duplicate", "answers": {"A": "a", "B": "b"},
+                     "correct_answer": "A"})
+    sampler = QuizSampler([first, second, twin])
+    for seed in SEEDS:
+        quiz, _ = sampler.sample(3, Blueprint(exclude={first}, seed=seed))
+        assert quiz and first not in quiz
+        assert len(quiz) == 2